@@ -1,22 +1,26 @@
 #!/usr/bin/env python3
 import random
-import datetime
-import copy
 import os
 import time
-import json
-import math
+import struct
 import traceback
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 
 # --- Constants ---
 MAX_DEPTH = 3             # Minimax search depth
-NUM_DICE_SAMPLES = 14     # Number of dice samples for Minimax chance nodes
+DICE_POOL_SIZE = 4096     # Die faces drawn per bulk refill of the dice pool
+AI_WORKERS = os.cpu_count() or 1 # Processes for root-parallel search (1 = serial)
+AI_TIME_BUDGET = 15.0     # Seconds per AI move; deepening stops once exceeded
 
 # --- Heuristic Weights Definition ---
-@dataclass
-class HeuristicWeights:
-    """Stores weights for different heuristic components."""
+class HeuristicWeights(NamedTuple):
+    """Stores weights for different heuristic components.
+
+    A tuple so the evaluator can unpack all weights in one step; keep the
+    field order in sync with the unpack in _eval_core.
+    """
     PIP_SCORE_FACTOR: float = 1.0
     OFF_SCORE_FACTOR: float = 10.0
     HIT_BONUS: float = 30.0
@@ -67,11 +71,310 @@ PHASE_WEIGHTS = {
     'ENDGAME': ENDGAME_WEIGHTS
 }
 
+# --- Zobrist Hashing Keys ---
+# Fixed seed so every process (e.g. search workers) derives the same keys.
+_zobrist_rng = random.Random(0xB6A33)
+# ZOBRIST_POINT[idx][count + 15]; an empty point contributes nothing.
+ZOBRIST_POINT = [
+    [_zobrist_rng.getrandbits(64) if count else 0 for count in range(-15, 16)]
+    for _ in range(24)
+]
+ZOBRIST_BAR_W = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_BAR_B = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_OFF_W = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_OFF_B = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64) # XORed in when Black is to move
+
+
+# --- Dice Pool ---
+def _dice_stream():
+    """Yields die faces, drawing DICE_POOL_SIZE of them per refill."""
+    faces = range(1, 7)
+    while True:
+        yield from random.choices(faces, k=DICE_POOL_SIZE)
+
+_DICE = _dice_stream()
+
+# Remaining dice are packed one per 4-bit slot (slot 0 = first die, 0 = used)
+def _encode_dice(dice):
+    """Packs up to four die values into a nibble mask, in order."""
+    mask = 0
+    for slot, die in enumerate(dice): mask |= die << (slot * 4)
+    return mask
+
+def _decode_dice(mask):
+    """Lists the dice left in a nibble mask, in slot order."""
+    dice = []
+    while mask:
+        die = mask & 0xF
+        if die: dice.append(die)
+        mask >>= 4
+    return dice
+
+def _first_slot_with_value(mask, die):
+    """Returns the first slot holding die, or -1."""
+    slot = 0
+    while mask:
+        if mask & 0xF == die: return slot
+        mask >>= 4
+        slot += 1
+    return -1
+
+# Move-sequence search counts the dice left per face: (c1, ..., c6)
+_NO_DICE = (0,) * 6
+
+def _dice_counts(dice):
+    """Counts the dice per face, as a hashable 6-tuple."""
+    counts = [0] * 6
+    for die in dice: counts[die - 1] += 1
+    return tuple(counts)
+
+
+# --- Move Generation Kernels ---
+# Pure functions over plain ints/lists (no game object, no player strings)
+# behind BackgammonGame._get_single_moves_for_die and _can_bear_off.
+
+# Per-die move tables, built once: _MOVES_W[die][pos] is the (src, dst)
+# tuple for moving a checker from pos (None when it would leave the board).
+_MOVES_W = [None] + [
+    [None] + [(pos, pos + die) if pos + die <= 24 else None for pos in range(1, 25)]
+    for die in range(1, 7)
+]
+_MOVES_B = [None] + [
+    [None] + [(pos, pos - die) if pos - die >= 1 else None for pos in range(1, 25)]
+    for die in range(1, 7)
+]
+_ENTRY_MOVES_W = [None] + [('bar', die) for die in range(1, 7)]
+_ENTRY_MOVES_B = [None] + [('bar', 25 - die) for die in range(1, 7)]
+_BEAR_OFF_MOVES = [None] + [(pos, 'off') for pos in range(1, 25)]
+# Move tables handed to _single_moves_for_die: it emits whatever they hold
+MOVE_TUPLE_TABLES = (_MOVES_W, _MOVES_B, _ENTRY_MOVES_W, _ENTRY_MOVES_B, _BEAR_OFF_MOVES)
+
+# Int move codes (src_code * 32 + dst_code, 'bar' = 0, 'off' = 31): cheaper
+# to hash and dedupe than tuples. _MOVE_BY_CODE decodes back to the tuple.
+BAR_CODE, OFF_CODE = 0, 31
+
+def _move_code(src, dst):
+    """Packs a (src, dst) move into a single int."""
+    return (BAR_CODE if src == 'bar' else src) * 32 + \
+        (OFF_CODE if dst == 'off' else dst)
+
+def _to_codes(table):
+    """Mirrors a move table (nested lists of tuples) with int codes."""
+    return [_to_codes(item) if isinstance(item, list) else
+            None if item is None else _move_code(*item) for item in table]
+
+MOVE_CODE_TABLES = tuple(_to_codes(table) for table in MOVE_TUPLE_TABLES)
+_MOVE_BY_CODE = [None] * (32 * 32)
+for _row in _MOVES_W[1:] + _MOVES_B[1:] + \
+        [_ENTRY_MOVES_W, _ENTRY_MOVES_B, _BEAR_OFF_MOVES]:
+    for _move in _row:
+        if _move is not None: _MOVE_BY_CODE[_move_code(*_move)] = _move
+del _row, _move
+
+# Sources (as bitboards) whose destination stays on the board, per die
+_STAY_ON_MASK_W = [0] + [(1 << (24 - die)) - 1 for die in range(1, 7)]
+_STAY_ON_MASK_B = [0] + [((1 << 24) - 1) ^ ((1 << die) - 1) for die in range(1, 7)]
+# Home points "behind" a checker (farther from bearing off), per position:
+# White points 19..pos-1, Black points pos+1..6 (0 outside the home board)
+BEHIND_MASK_W = [((1 << (pos - 1)) - 1) & ~((1 << 18) - 1) if pos >= 19 else 0
+                 for pos in range(25)]
+BEHIND_MASK_B = [((1 << 6) - 1) & ~((1 << pos) - 1) if 1 <= pos <= 6 else 0
+                 for pos in range(25)]
+
+def _bear_off_allowed(occ, checker_pos, die_value, is_white):
+    """Checks if the checker on checker_pos can be borne off with die_value.
+
+    occ is the mover's occupancy bitboard.
+    """
+    if is_white:
+        if not (19 <= checker_pos <= 24): return False
+        required_dist = 25 - checker_pos
+        if die_value == required_dist: return True
+        # Overshoot: only legal if no own checker sits behind this one
+        return die_value > required_dist and not occ & BEHIND_MASK_W[checker_pos]
+    if not (1 <= checker_pos <= 6): return False
+    required_dist = checker_pos
+    if die_value == required_dist: return True
+    return die_value > required_dist and not occ & BEHIND_MASK_B[checker_pos]
+
+
+def _single_moves_for_die(occ, blocked, bar_count, die_value,
+                          is_white, all_home, move_tables=MOVE_TUPLE_TABLES):
+    """Lists the moves for one die, as (src, dst) tuples or int codes.
+
+    occ is the mover's occupancy bitboard, blocked the opponent's made
+    points (>= 2 checkers). move_tables selects the move representation
+    (MOVE_TUPLE_TABLES or MOVE_CODE_TABLES). Sources are visited lowest
+    point first.
+    """
+    moves_w, moves_b, entry_moves_w, entry_moves_b, bear_off_moves = move_tables
+    if is_white:
+        if bar_count > 0:
+            if (blocked >> (die_value - 1)) & 1: return []
+            return [entry_moves_w[die_value]]
+        moves_for_die = moves_w[die_value]
+        stay_on_mask = _STAY_ON_MASK_W[die_value]
+        # Shift the blocked points back onto the sources that would land there
+        open_moves = occ & stay_on_mask & ~(blocked >> die_value)
+    else:
+        if bar_count > 0:
+            if (blocked >> (24 - die_value)) & 1: return []
+            return [entry_moves_b[die_value]]
+        moves_for_die = moves_b[die_value]
+        stay_on_mask = _STAY_ON_MASK_B[die_value]
+        open_moves = occ & stay_on_mask & ~(blocked << die_value)
+
+    candidates = open_moves
+    if all_home:
+        # Bear-offs: the checker exactly die_value from home, plus the
+        # farthest checker when the die overshoots it
+        if is_white:
+            candidates |= occ & (1 << (24 - die_value))
+            farthest_bit = occ & -occ
+            if 25 - farthest_bit.bit_length() < die_value: candidates |= farthest_bit
+        else:
+            candidates |= occ & (1 << (die_value - 1))
+            farthest_pos = occ.bit_length()
+            if 0 < farthest_pos < die_value: candidates |= 1 << (farthest_pos - 1)
+
+    moves = []
+    while candidates:
+        low_bit = candidates & -candidates
+        candidates ^= low_bit
+        pos = low_bit.bit_length()
+        if low_bit & open_moves:
+            moves.append(moves_for_die[pos])
+        else:
+            moves.append(bear_off_moves[pos])
+    return moves
+
+
+# --- Evaluation Kernel ---
+# Bitboard masks (bit i = board index i) of each player's home board
+HOME_MASK_W = 0b111111 << 18
+HOME_MASK_B = 0b111111
+# ... and of the three deepest home points
+INNER_MASK_W = 0b111 << 21
+INNER_MASK_B = 0b111
+
+# Per-colour constants for _eval_core: (p_sign, home mask, inner home mask,
+# anchor mask (opponent's home), trapped zone is below the prime,
+# back zone as (board index, pip distance) pairs, and per board index the
+# indices an opponent checker can hit it from with one die)
+_EVAL_SIDE_W = (1, HOME_MASK_W, INNER_MASK_W, HOME_MASK_B, True,
+                tuple((pos - 1, 25 - pos) for pos in range(1, 7)),
+                tuple(tuple(range(idx + 1, min(idx + 7, 24))) for idx in range(24)))
+_EVAL_SIDE_B = (-1, HOME_MASK_B, INNER_MASK_B, HOME_MASK_W, False,
+                tuple((pos - 1, pos) for pos in range(19, 25)),
+                tuple(tuple(range(max(idx - 6, 0), idx)) for idx in range(24)))
+
+def _opp_counts(board, p_sign):
+    """Opponent checker count per board index (0 where the opponent has none)."""
+    if p_sign > 0: return [-count if count < 0 else 0 for count in board]
+    return [count if count > 0 else 0 for count in board]
+
+def _eval_core(board, made, blots, p_pip, o_pip, p_off, o_off, p_bar, o_bar, side, weights):
+    """Heuristic score from the evaluated side's point of view.
+
+    Takes plain ints/lists only (no game object, no player strings): made
+    and blots are bitboards, side is _EVAL_SIDE_W or _EVAL_SIDE_B.
+    """
+    pip_f,off_f,hit_b,bar_p,point_b,home_b,inner_b,anchor_b,prime_b,shot_f,blot_red,_aggr_t,prison_b,back_f,trapped_b=weights
+    p_sign,home_mask,inner_mask,anchor_mask,traps_below,back_zone,shooters=side;opp_counts=None
+    pip_score=(o_pip-p_pip)*pip_f;off_score=(p_off-o_off)*off_f;bar_penalty=p_bar*bar_p;hit_bonus=o_bar*hit_b
+    # Made points as a bitboard: each bonus is a popcount of a masked view
+    home_points_made_count=(made&home_mask).bit_count()
+    point_bonus_total=made.bit_count()*point_b;home_point_bonus_total=home_points_made_count*home_b;inner_home_bonus_total=(made&inner_mask).bit_count()*inner_b;anchor_bonus_total=(made&anchor_mask).bit_count()*anchor_b
+    blot_penalty_total=0.0;trapped_checker_bonus_total=0.0
+    if blots:
+        opp_counts=_opp_counts(board,p_sign)
+        while blots:
+            low_bit=blots&-blots;blots^=low_bit;blot_idx=low_bit.bit_length()-1
+            direct_shots=0
+            for shooter_idx in shooters[blot_idx]: direct_shots+=opp_counts[shooter_idx]
+            # A blot in our home board sits on an entry point of the opponent's bar checkers
+            if o_bar>0 and low_bit&home_mask: direct_shots+=o_bar
+            penalty_for_this_blot=direct_shots*shot_f;blot_penalty_total+=penalty_for_this_blot
+        if o_bar>0: blot_penalty_total*=blot_red
+    # Primes (4+ made points in a row): bits where a run of 4 starts, run starts only
+    prime_bonus_total=0.0;prime_starts=made&(made>>1)&(made>>2)&(made>>3)&~(made<<1)
+    while prime_starts:
+        low_bit=prime_starts&-prime_starts;prime_starts^=low_bit;prime_start_idx=low_bit.bit_length()-1
+        run=made>>prime_start_idx;prime_len=(~run&(run+1)).bit_length()-1
+        prime_bonus_total+=(prime_len-3)*prime_b
+        if trapped_b!=0 and prime_len>=5:
+            if opp_counts is None: opp_counts=_opp_counts(board,p_sign)
+            trapped_count=sum(opp_counts[:prime_start_idx]) if traps_below else sum(opp_counts[prime_start_idx+prime_len:])
+            trapped_checker_bonus_total+=trapped_count*trapped_b
+    midgame_prison_bonus=0.0
+    if prison_b and home_points_made_count>=3 and o_bar>0:
+         midgame_prison_bonus=prison_b*o_bar
+    back_checker_penalty=0.0;is_far_behind=p_pip>0 and o_pip>0 and p_pip>=1.5*o_pip
+    if back_f and is_far_behind:
+        back_checker_pip_sum=0
+        for point_index,distance in back_zone:
+            count=board[point_index]
+            if count*p_sign>0: back_checker_pip_sum+=distance*abs(count)
+        back_checker_penalty=back_checker_pip_sum*back_f*-1.0
+    total_score=(pip_score+off_score+bar_penalty+hit_bonus+point_bonus_total+home_point_bonus_total+inner_home_bonus_total+anchor_bonus_total+prime_bonus_total+blot_penalty_total+midgame_prison_bonus+trapped_checker_bonus_total+back_checker_penalty)
+    return total_score
+
+
+# --- Board Display ---
+# Text-board layout, split into rows of chars once at import
+_TEMPLATE_ROWS = (
+    tuple("   13 14 15 16 17 18 |BAR| 19 20 21 22 23 24    "),
+    tuple("   +-----------------+---+-------------------+  "),
+    tuple("   |                 |   |                   |  "), # Row 2
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "), # Row 6
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "), # Row 9
+    tuple("   +-----------------+BAR+-------------------+  "), # Row 10
+    tuple("   |                 |   |                   |  "), # Row 11
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "),
+    tuple("   |                 |   |                   |  "), # Row 18 (Added Row)
+    tuple("   +-----------------+---+-------------------+  "), # Row 19 (was 18)
+    tuple("   12 11 10 09 08 07 |BAR| 06 05 04 03 02 01    ")  # Row 20 (was 19)
+)
+_NUM_BOARD_ROWS = len(_TEMPLATE_ROWS)
+_BOARD_BASE_WIDTH = max(len(row) for row in _TEMPLATE_ROWS)
+_COL_MAP = {
+     1: 43,  2: 40,  3: 37,  4: 34,  5: 31,  6: 28,
+    19: 28, 20: 31, 21: 34, 22: 37, 23: 40, 24: 43,
+     7: 19,  8: 16,  9: 13, 10: 10, 11:  7, 12:  4,
+    13:  4, 14:  7, 15: 10, 16: 13, 17: 16, 18: 19
+}
+_BAR_COL = 23
+_DICE_FACES_LARGE = {
+    1: ("+-------+", "|       |", "|   o   |", "|       |", "+-------+"),
+    2: ("+-------+", "| o     |", "|       |", "|     o |", "+-------+"),
+    3: ("+-------+", "| o     |", "|   o   |", "|     o |", "+-------+"),
+    4: ("+-------+", "| o   o |", "|       |", "| o   o |", "+-------+"),
+    5: ("+-------+", "| o   o |", "|   o   |", "| o   o |", "+-------+"),
+    6: ("+-------+", "| o o o |", "|       |", "| o o o |", "+-------+")
+}
+
 
 # --- Backgammon Game Class ---
 class BackgammonGame:
     """Manages game state, rules, evaluation for Human vs AI play."""
     OPENING_EXIT_TOTAL_PIP_THRESHOLD = 280
+    # Pip distance of each board index (0-23) for White / Black
+    _DIST_W = tuple(range(24, 0, -1))
+    _DIST_B = tuple(range(1, 25))
+    # Packed state key: 24 signed points, bars, offs, player to move
+    _STATE_KEY = struct.Struct('<24b4Bc')
+    PLAYABLE_CACHE_LIMIT = 100000
 
     def __init__(self, human_player=None):
         """Initializes the game board and state."""
@@ -85,50 +388,128 @@ class BackgammonGame:
         self.black_off = 0
         self.winner = None
         self.current_player = 'w'
-        self.dice = []
+        self._dice_mask = 0
         self.available_moves = []
+        # (zhash, player, dice) -> playable dice; shared with copies
+        self._playable_cache = {}
         self.human_player = human_player
         self.ai_player = None
         if human_player == 'w':
             self.ai_player = 'b'
         elif human_player == 'b':
             self.ai_player = 'w'
+        self._rebuild_derived_state()
         self.current_phase = self.determine_game_phase()
         self.white_last_turn_sequence = []
         self.black_last_turn_sequence = []
 
+    def _rebuild_derived_state(self):
+        """Recomputes bitboards, Zobrist hash and pip counts from scratch."""
+        w_occ = b_occ = w_blot = b_blot = 0
+        zhash = (ZOBRIST_BAR_W[self.white_bar] ^ ZOBRIST_BAR_B[self.black_bar] ^
+                 ZOBRIST_OFF_W[self.white_off] ^ ZOBRIST_OFF_B[self.black_off])
+        for idx, count in enumerate(self.board):
+            zhash ^= ZOBRIST_POINT[idx][count + 15]
+            if count > 0:
+                w_occ |= 1 << idx
+                if count == 1: w_blot |= 1 << idx
+            elif count < 0:
+                b_occ |= 1 << idx
+                if count == -1: b_blot |= 1 << idx
+        self.w_occ, self.b_occ = w_occ, b_occ
+        self.w_blot, self.b_blot = w_blot, b_blot
+        self.zhash = zhash
+        self._key = self._key_player = None
+        board = self.board
+        self._pip_w = self.white_bar * 25 + \
+            sum([d * c for d, c in zip(self._DIST_W, board) if c > 0])
+        self._pip_b = self.black_bar * 25 - \
+            sum([d * c for d, c in zip(self._DIST_B, board) if c < 0])
+        self._phase_stale = True
+
+    def _sync_point(self, idx, old_count):
+        """Updates derived state after board[idx] changed from old_count."""
+        bit = 1 << idx
+        keep = ~bit
+        count = self.board[idx]
+        zobrist_keys = ZOBRIST_POINT[idx]
+        self.zhash ^= zobrist_keys[old_count + 15] ^ zobrist_keys[count + 15]
+        if old_count > 0: self._pip_w -= old_count * (24 - idx)
+        elif old_count < 0: self._pip_b += old_count * (idx + 1)
+        if count > 0: self._pip_w += count * (24 - idx)
+        elif count < 0: self._pip_b -= count * (idx + 1)
+        w_occ, b_occ = self.w_occ & keep, self.b_occ & keep
+        w_blot, b_blot = self.w_blot & keep, self.b_blot & keep
+        if count > 0:
+            w_occ |= bit
+            if count == 1: w_blot |= bit
+        elif count < 0:
+            b_occ |= bit
+            if count == -1: b_blot |= bit
+        self.w_occ, self.b_occ = w_occ, b_occ
+        self.w_blot, self.b_blot = w_blot, b_blot
+
+    def _sync_counters(self, old_bar_w, old_bar_b, old_off_w, old_off_b):
+        """Updates hash and pips for bar/off counts changed from old values."""
+        if self.white_bar != old_bar_w:
+            self.zhash ^= ZOBRIST_BAR_W[old_bar_w] ^ ZOBRIST_BAR_W[self.white_bar]
+            self._pip_w += (self.white_bar - old_bar_w) * 25
+        if self.black_bar != old_bar_b:
+            self.zhash ^= ZOBRIST_BAR_B[old_bar_b] ^ ZOBRIST_BAR_B[self.black_bar]
+            self._pip_b += (self.black_bar - old_bar_b) * 25
+        if self.white_off != old_off_w:
+            self.zhash ^= ZOBRIST_OFF_W[old_off_w] ^ ZOBRIST_OFF_W[self.white_off]
+        if self.black_off != old_off_b:
+            self.zhash ^= ZOBRIST_OFF_B[old_off_b] ^ ZOBRIST_OFF_B[self.black_off]
+
+    def to_payload(self):
+        """Compact picklable snapshot of the position, for worker processes."""
+        return self.board_tuple()
+
+    @classmethod
+    def from_payload(cls, payload, playable_cache=None):
+        """Rebuilds a game from to_payload() output (no dice or UI state)."""
+        fields = cls._STATE_KEY.unpack(payload)
+        game = cls()
+        game.board = list(fields[:24])
+        game.white_bar, game.black_bar, game.white_off, game.black_off = fields[24:28]
+        game.current_player = fields[28].decode()
+        if playable_cache is not None: game._playable_cache = playable_cache
+        game._rebuild_derived_state()
+        game.current_phase = game.determine_game_phase()
+        return game
+
     def copy(self):
         """Creates a deep copy for AI simulation."""
-        new_game = BackgammonGame(human_player=self.human_player)
+        # Every field is overwritten below, so skip __init__'s setup work
+        new_game = BackgammonGame.__new__(BackgammonGame)
+        new_game.human_player = self.human_player
+        new_game.ai_player = self.ai_player
         new_game.board = list(self.board)
+        new_game.w_occ, new_game.b_occ = self.w_occ, self.b_occ
+        new_game.w_blot, new_game.b_blot = self.w_blot, self.b_blot
+        new_game.zhash = self.zhash
+        new_game._key, new_game._key_player = self._key, self._key_player
+        new_game._pip_w, new_game._pip_b = self._pip_w, self._pip_b
+        new_game._phase_stale = self._phase_stale
         new_game.white_bar = self.white_bar
         new_game.black_bar = self.black_bar
         new_game.white_off = self.white_off
         new_game.black_off = self.black_off
         new_game.winner = self.winner
         new_game.current_player = self.current_player
-        new_game.dice = list(self.dice)
-        new_game.available_moves = list(self.available_moves)
+        new_game._dice_mask = self._dice_mask
+        new_game._available_moves = None if self._available_moves is None \
+            else list(self._available_moves)
+        new_game._playable_cache = self._playable_cache
         new_game.current_phase = self.current_phase
         new_game.white_last_turn_sequence = list(self.white_last_turn_sequence)
         new_game.black_last_turn_sequence = list(self.black_last_turn_sequence)
         return new_game
 
     def calculate_pip(self, player):
-        """Calculates the pip count for a player."""
-        pip = 0
-        p_sign = 1 if player == 'w' else -1
-        p_bar_count = self.white_bar if player == 'w' else self.black_bar
-
-        for pos in range(1, 25):
-            point_index = pos - 1
-            count = self.board[point_index]
-            if count * p_sign > 0:
-                distance = (25 - pos) if player == 'w' else pos
-                pip += distance * abs(count)
-
-        pip += p_bar_count * 25
-        return pip
+        """Returns the pip count for a player (maintained incrementally)."""
+        return self._pip_w if player == 'w' else self._pip_b
 
     def is_game_over(self):
         """Checks if the game has ended."""
@@ -141,11 +522,16 @@ class BackgammonGame:
         return False
 
     def board_tuple(self):
-        """Returns a hashable representation of the core game state."""
-        return (
-            tuple(self.board), self.white_bar, self.black_bar,
-            self.white_off, self.black_off, self.current_player
-        )
+        """Returns a hashable representation of the core game state.
+
+        The packed key is cached until the position or player changes.
+        """
+        if self._key is None or self._key_player != self.current_player:
+            self._key = self._STATE_KEY.pack(
+                *self.board, self.white_bar, self.black_bar,
+                self.white_off, self.black_off, self.current_player.encode())
+            self._key_player = self.current_player
+        return self._key
 
     def get_total_checker_count(self):
         """Counts all checkers for validation."""
@@ -186,43 +572,24 @@ class BackgammonGame:
         except Exception: return None, None, None
 
     # --- Rule Functions ---
+    def is_race(self):
+        """True once the sides can no longer hit each other (pure race)."""
+        if self.white_bar or self.black_bar: return False
+        return (self.w_occ & -self.w_occ).bit_length() > self.b_occ.bit_length()
+
     def _check_all_pieces_home(self, player, game_state):
         """Checks if all player's pieces are in their home board."""
-        p_sign = 1 if player == 'w' else -1
-        bar_count = game_state.white_bar if player == 'w' \
-            else game_state.black_bar
-        if bar_count > 0: return False
-
-        outside_range = range(1, 19) if player == 'w' else range(7, 25)
-        for pos in outside_range:
-            point_index = pos - 1
-            if game_state.board[point_index] * p_sign > 0: return False
-        return True
+        if player == 'w':
+            return game_state.white_bar == 0 and \
+                (game_state.w_occ & ~HOME_MASK_W) == 0
+        return game_state.black_bar == 0 and \
+            (game_state.b_occ & ~HOME_MASK_B) == 0
 
     def _can_bear_off(self, player, checker_pos, die_value, game_state):
         """Checks if a specific checker can be legally borne off."""
-        p_sign = 1 if player == 'w' else -1
-        board = game_state.board
-        home_start, home_end = (19, 24) if player == 'w' else (1, 6)
-
-        if not (home_start <= checker_pos <= home_end): return False
-
-        target_point_for_exact_off = 25 if player == 'w' else 0
-        required_dist = abs(target_point_for_exact_off - checker_pos)
-
-        if die_value == required_dist: return True
-
-        is_overshoot = (player == 'w' and checker_pos + die_value > 24) or \
-                       (player == 'b' and checker_pos - die_value < 1)
-
-        if is_overshoot and die_value > required_dist:
-             check_behind_range = range(home_start, checker_pos) if player == 'w' \
-                 else range(checker_pos + 1, home_end + 1)
-             for p in check_behind_range:
-                 point_index = p - 1
-                 if board[point_index] * p_sign > 0: return False
-             return True
-        return False
+        if player == 'w':
+            return _bear_off_allowed(game_state.w_occ, checker_pos, die_value, True)
+        return _bear_off_allowed(game_state.b_occ, checker_pos, die_value, False)
 
     def _get_die_for_move(self, src, dst, player):
         """Determines the nominal die value for a move (ignores overshoot)."""
@@ -242,49 +609,43 @@ class BackgammonGame:
             else: return None
         except Exception: return None
 
-    def _get_single_moves_for_die(self, player, die_value, current_state):
+    def _get_single_moves_for_die(self, player, die_value, current_state,
+                                  move_tables=MOVE_TUPLE_TABLES):
         """Finds all possible single (src, dst) moves for ONE die value."""
-        moves = []
-        p_sign = 1 if player == 'w' else -1
-        p_bar = current_state.white_bar if player == 'w' \
-            else current_state.black_bar
-        board = current_state.board
-
-        if p_bar > 0:
-            entry_point = die_value if player == 'w' else (25 - die_value)
-            if 1 <= entry_point <= 24:
-                entry_idx = entry_point - 1
-                dest_count = board[entry_idx]
-                is_allowed_entry = (dest_count * p_sign >= 0) or \
-                                   (abs(dest_count) == 1)
-                if is_allowed_entry:
-                    moves.append(('bar', entry_point))
-            return moves
-
-        all_checkers_home = self._check_all_pieces_home(player, current_state)
-        for pos in range(1, 25):
-            pos_idx = pos - 1
-            checker_count = board[pos_idx]
-
-            if checker_count * p_sign > 0:
-                dest_point = (pos + die_value) if player == 'w' \
-                    else (pos - die_value)
-                if 1 <= dest_point <= 24:
-                    dest_idx = dest_point - 1
-                    dest_count = board[dest_idx]
-                    is_allowed_move = (dest_count * p_sign >= 0) or \
-                                      (abs(dest_count) == 1)
-                    if is_allowed_move:
-                        moves.append((pos, dest_point))
-                elif all_checkers_home:
-                    if self._can_bear_off(player, pos, die_value, current_state):
-                         moves.append((pos, 'off'))
-        return moves
+        if player == 'w':
+            return _single_moves_for_die(
+                current_state.w_occ,
+                current_state.b_occ & ~current_state.b_blot,
+                current_state.white_bar, die_value, True,
+                self._check_all_pieces_home(player, current_state), move_tables)
+        return _single_moves_for_die(
+            current_state.b_occ,
+            current_state.w_occ & ~current_state.w_blot,
+            current_state.black_bar, die_value, False,
+            self._check_all_pieces_home(player, current_state), move_tables)
 
     def _get_strictly_playable_dice(self, current_state_obj, dice_list, player):
         """Determines which dice *must* or *can* be played."""
         if not dice_list: return []
 
+        first_die = dice_list[0]
+        if dice_list.count(first_die) == len(dice_list): # Doubles / single die
+            if self._get_single_moves_for_die(player, first_die, current_state_obj):
+                return [first_die]
+            return []
+
+        cache = current_state_obj._playable_cache
+        cache_key = (current_state_obj.zhash, player, tuple(sorted(dice_list)))
+        playable = cache.get(cache_key)
+        if playable is None:
+            playable = self._compute_strictly_playable_dice(
+                current_state_obj, dice_list, player)
+            if len(cache) >= self.PLAYABLE_CACHE_LIMIT: cache.clear()
+            cache[cache_key] = playable
+        return playable
+
+    def _compute_strictly_playable_dice(self, current_state_obj, dice_list, player):
+        """Uncached rule check behind _get_strictly_playable_dice."""
         possible_moves_by_die = {}
         individually_playable_dice = []
         unique_dice = sorted(list(set(dice_list)), reverse=True)
@@ -308,29 +669,33 @@ class BackgammonGame:
 
             if can_play_larger and can_play_smaller:
                 can_play_both_sequence = False
-                # Try large then small
+                p_sign = 1 if player == 'w' else -1
+                # Try large then small (simulated in place, then undone).
+                # Moves come straight from the generator: use the fast path.
                 if larger_die in possible_moves_by_die:
                     for move_lg in possible_moves_by_die[larger_die]:
-                        temp_game = current_state_obj.copy()
-                        if temp_game.make_move_base_logic(
-                            player, move_lg[0], move_lg[1]
-                        ):
-                            if temp_game._get_single_moves_for_die(
-                                player, smaller_die, temp_game
-                            ):
-                                can_play_both_sequence = True; break
+                        undo = current_state_obj._apply_move_fast(
+                            p_sign, move_lg[0], move_lg[1]
+                        )
+                        follow_up = current_state_obj._get_single_moves_for_die(
+                            player, smaller_die, current_state_obj
+                        )
+                        current_state_obj.unmake_move_base_logic(undo)
+                        if follow_up:
+                            can_play_both_sequence = True; break
                 # Try small then large if first failed
                 if not can_play_both_sequence and \
                    smaller_die in possible_moves_by_die:
                     for move_sm in possible_moves_by_die[smaller_die]:
-                        temp_game = current_state_obj.copy()
-                        if temp_game.make_move_base_logic(
-                            player, move_sm[0], move_sm[1]
-                        ):
-                            if temp_game._get_single_moves_for_die(
-                                player, larger_die, temp_game
-                            ):
-                                can_play_both_sequence = True; break
+                        undo = current_state_obj._apply_move_fast(
+                            p_sign, move_sm[0], move_sm[1]
+                        )
+                        follow_up = current_state_obj._get_single_moves_for_die(
+                            player, larger_die, current_state_obj
+                        )
+                        current_state_obj.unmake_move_base_logic(undo)
+                        if follow_up:
+                            can_play_both_sequence = True; break
 
                 # If both cannot be played, but larger can, must play larger
                 if not can_play_both_sequence and can_play_larger:
@@ -341,36 +706,92 @@ class BackgammonGame:
 
         return individually_playable_dice
 
+    def enumerate_moves(self, dice_counts, player):
+        """Lists every legal next move as (move, dice counts left after it).
+
+        Fuses the playable-dice rule, per-die generation and the bear-off
+        die assignment: an overshoot bear-off is attributed to the smallest
+        allowed die that can bear that checker off. dice_counts is a
+        non-empty per-face count tuple (see _dice_counts).
+        """
+        faces = [die for die in range(1, 7) if dice_counts[die - 1]]
+        if len(faces) == 1: # Doubles / single die
+            first_die = faces[0]
+            moves = self._get_single_moves_for_die(player, first_die, self)
+            moves_by_die = [(first_die, moves)] if moves else []
+        else:
+            moves_by_die = [
+                (die, self._get_single_moves_for_die(player, die, self))
+                for die in self._get_strictly_playable_dice(self, faces, player)
+            ]
+
+        next_moves = []
+        for die_val, moves in moves_by_die:
+            j = die_val - 1
+            next_dice_counts = dice_counts[:j] + (dice_counts[j] - 1,) + dice_counts[j + 1:]
+            for move in moves:
+                if move[1] == 'off':
+                    needed_dist = (25 - move[0]) if player == 'w' else move[0]
+                    if needed_dist < die_val and any(
+                            needed_dist <= die < die_val for die, _ in moves_by_die):
+                        continue # A smaller allowed die bears this checker off
+                next_moves.append((move, next_dice_counts))
+        return next_moves
+
+    @property
+    def dice(self):
+        """Dice left to play this turn, as a list (decoded from _dice_mask)."""
+        return _decode_dice(self._dice_mask)
+
+    @dice.setter
+    def dice(self, dice):
+        self._dice_mask = _encode_dice(dice)
+
+    def dice_list(self):
+        """Dice left to play, for display."""
+        return _decode_dice(self._dice_mask)
+
+    def has_die(self, die):
+        """True if a die of this value is still unplayed."""
+        return _first_slot_with_value(self._dice_mask, die) >= 0
+
     def get_legal_actions(self):
         """Calculates all legal single moves for the current dice state."""
         player = self.current_player
-        if not self.dice: return []
+        if not self._dice_mask: return []
 
         playable_dice_values = self._get_strictly_playable_dice(
-            self, list(self.dice), player
+            self, self.dice, player
         )
 
-        final_moves = set()
+        final_move_codes = set() # Dedupe on int codes, decode once at the end
         for die_val in playable_dice_values:
-             moves_for_this_die = self._get_single_moves_for_die(
-                 player, die_val, self
+             move_codes_for_this_die = self._get_single_moves_for_die(
+                 player, die_val, self, MOVE_CODE_TABLES
              )
-             final_moves.update(moves_for_this_die)
+             final_move_codes.update(move_codes_for_this_die)
 
-        return list(final_moves)
+        return [_MOVE_BY_CODE[code] for code in final_move_codes]
+
+    @property
+    def available_moves(self):
+        """Legal single moves for the current dice, computed on first read."""
+        if self._available_moves is None:
+            self._available_moves = self.get_legal_actions()
+        return self._available_moves
+
+    @available_moves.setter
+    def available_moves(self, moves):
+        self._available_moves = moves
 
     def make_move(self, src, dst):
-        """Applies a single validated move and updates game state."""
+        """Applies a single validated move (human UI: die is looked up)."""
         player = self.current_player
-        p_sign = 1 if player == 'w' else -1
-        opp_bar = 'black_bar' if player == 'w' else 'white_bar'
-        p_bar = 'white_bar' if player == 'w' else 'black_bar'
-        p_off = 'white_off' if player == 'w' else 'black_off'
 
         die_to_remove = None
         nominal_die = self._get_die_for_move(src, dst, player)
 
-        if nominal_die is not None and nominal_die in self.dice:
+        if nominal_die is not None and self.has_die(nominal_die):
             die_to_remove = nominal_die
         elif dst == 'off' and isinstance(src, int):
              needed_dist = (25 - src) if player == 'w' else src
@@ -386,40 +807,28 @@ class BackgammonGame:
         if die_to_remove is None:
             print(f"ERROR: Cannot find die in {self.dice} for move {src}/{dst}")
             return False
+        return self.make_move_with_die(src, dst, die_to_remove)
+
+    def make_move_with_die(self, src, dst, die_to_remove):
+        """Applies a move whose die is already known and updates game state."""
+        player = self.current_player
+        slot = _first_slot_with_value(self._dice_mask, die_to_remove)
+        if slot < 0:
+            print(f"ERROR: Die {die_to_remove} not in {self.dice} for move {src}/{dst}")
+            return False
 
         board_before = list(self.board)
         bars_before = (self.white_bar, self.black_bar)
         off_before = (self.white_off, self.black_off)
-        dice_before = list(self.dice)
+        dice_before = self._dice_mask
 
         try:
-            if src == 'bar':
-                if player == 'w': self.white_bar -= 1
-                else: self.black_bar -= 1
-            else:
-                source_index = src - 1
-                self.board[source_index] -= p_sign
+            if not self.make_move_base_logic(player, src, dst):
+                print(f"CRITICAL: Tried illegal move {src}/{dst}!")
+                raise ValueError("Illegal move")
 
-            if dst == 'off':
-                if player == 'w': self.white_off += 1
-                else: self.black_off += 1
-            else:
-                dest_index = dst - 1
-                dest_count = self.board[dest_index]
-                if dest_count * p_sign < 0:
-                    if abs(dest_count) == 1:
-                        self.board[dest_index] = 0
-                        if player == 'w': self.black_bar += 1
-                        else: self.white_bar += 1
-                        self.board[dest_index] = p_sign
-                    else:
-                         print(f"CRITICAL: Tried move to blocked {dst}!")
-                         raise ValueError("Illegal move target")
-                else:
-                     self.board[dest_index] += p_sign
-
-            self.dice.remove(die_to_remove)
-            self.available_moves = self.get_legal_actions()
+            self._dice_mask ^= die_to_remove << (slot * 4)
+            self.available_moves = None # Recomputed on next read
             game_over = self.is_game_over()
 
             w_final, b_final = self.get_total_checker_count()
@@ -433,25 +842,34 @@ class BackgammonGame:
             self.board = board_before
             self.white_bar, self.black_bar = bars_before
             self.white_off, self.black_off = off_before
-            self.dice = dice_before
-            self.available_moves = self.get_legal_actions()
+            self._rebuild_derived_state()
+            self._dice_mask = dice_before
+            self.available_moves = None # Recomputed on next read
             print(f"!! UNEXPECTED Error applying make_move {player} {src}/{dst}: {e_unexpected}")
             traceback.print_exc()
             self.winner = "ERROR"
             return False
 
     def make_move_base_logic(self, player_base, src_base, dst_base):
-        """Simplified move logic for internal AI sim (NO dice check/update)."""
-        p_sign = 1 if player_base == 'w' else -1
+        """Simplified move logic for internal AI sim (NO dice check/update).
+
+        Returns an undo record (truthy) on success, False otherwise.
+        Pass the record to unmake_move_base_logic() to revert the move.
+        """
+        is_white = player_base == 'w'
+        p_sign = 1 if is_white else -1
+        b = self.board
         original_board_val_src = None
         original_board_val_dst = None
         original_bar_w, original_bar_b = self.white_bar, self.black_bar
         original_off_w, original_off_b = self.white_off, self.black_off
+        derived = (self.zhash, self.w_occ, self.b_occ, self.w_blot, self.b_blot,
+                   self._pip_w, self._pip_b, self._key)
         src_idx, dst_idx = -1, -1
 
         try:
             if src_base == 'bar':
-                if player_base == 'w':
+                if is_white:
                     if self.white_bar > 0: self.white_bar -= 1
                     else: return False
                 else:
@@ -459,49 +877,117 @@ class BackgammonGame:
                     else: return False
             elif isinstance(src_base, int) and 1 <= src_base <= 24:
                 src_idx = src_base - 1
-                original_board_val_src = self.board[src_idx]
+                original_board_val_src = b[src_idx]
                 if original_board_val_src * p_sign <= 0: return False
-                self.board[src_idx] -= p_sign
+                b[src_idx] = original_board_val_src - p_sign
             else: return False
 
             if dst_base == 'off':
-                if player_base == 'w': self.white_off += 1
+                if is_white: self.white_off += 1
                 else: self.black_off += 1
             elif isinstance(dst_base, int) and 1 <= dst_base <= 24:
                 dst_idx = dst_base - 1
-                original_board_val_dst = self.board[dst_idx]
-                dest_count = original_board_val_dst
-
-                if dest_count * p_sign < 0 and abs(dest_count) >= 2:
-                    if src_idx != -1: self.board[src_idx] += p_sign # Restore source
-                    return False
-
-                if dest_count * p_sign < 0 and abs(dest_count) == 1:
-                     if player_base == 'w': self.black_bar += 1
-                     else: self.white_bar += 1
-                     self.board[dst_idx] = 0
-                     self.board[dst_idx] = p_sign
+                dest_count = original_board_val_dst = b[dst_idx]
+
+                if dest_count * p_sign < 0:
+                    if dest_count * p_sign < -1: # Made point
+                        if src_idx != -1: b[src_idx] = original_board_val_src # Restore source
+                        return False
+                    # Hit: the blot goes to the bar, our checker takes its place
+                    if is_white: self.black_bar += 1
+                    else: self.white_bar += 1
+                    b[dst_idx] = p_sign
                 else:
-                     self.board[dst_idx] += p_sign
+                    b[dst_idx] = dest_count + p_sign
             else:
-                if src_idx != -1: self.board[src_idx] += p_sign # Restore source
+                if src_idx != -1: b[src_idx] = original_board_val_src # Restore source
                 if src_base == 'bar':
-                    if player_base == 'w': self.white_bar += 1
+                    if is_white: self.white_bar += 1
                     else: self.black_bar += 1
                 return False
-            return True
+            if src_idx != -1: self._sync_point(src_idx, original_board_val_src)
+            if dst_idx != -1: self._sync_point(dst_idx, original_board_val_dst)
+            self._sync_counters(original_bar_w, original_bar_b,
+                                original_off_w, original_off_b)
+            self._key = None
+            self._phase_stale = True
+            return (src_idx, dst_idx,
+                    original_board_val_src, original_board_val_dst,
+                    original_bar_w, original_bar_b,
+                    original_off_w, original_off_b, derived)
 
         except Exception:
              if src_idx != -1 and original_board_val_src is not None:
-                 self.board[src_idx] = original_board_val_src
+                 b[src_idx] = original_board_val_src
              if dst_idx != -1 and original_board_val_dst is not None:
-                 self.board[dst_idx] = original_board_val_dst
+                 b[dst_idx] = original_board_val_dst
              self.white_bar, self.black_bar = original_bar_w, original_bar_b
              self.white_off, self.black_off = original_off_w, original_off_b
              return False
 
+    def _apply_move_fast(self, p_sign, src, dst):
+        """Applies a generator-produced move without validation (AI hot path).
+
+        The caller guarantees legality (e.g. the move came from
+        _get_single_moves_for_die). Returns the same undo record as
+        make_move_base_logic.
+        """
+        board = self.board
+        bar_w, bar_b = self.white_bar, self.black_bar
+        off_w, off_b = self.white_off, self.black_off
+        derived = (self.zhash, self.w_occ, self.b_occ, self.w_blot, self.b_blot,
+                   self._pip_w, self._pip_b, self._key)
+        src_idx = dst_idx = -1
+        src_val = dst_val = None
+
+        if src == 'bar':
+            if p_sign > 0: self.white_bar -= 1
+            else: self.black_bar -= 1
+        else:
+            src_idx = src - 1
+            src_val = board[src_idx]
+            board[src_idx] = src_val - p_sign
+
+        if dst == 'off':
+            if p_sign > 0: self.white_off += 1
+            else: self.black_off += 1
+        else:
+            dst_idx = dst - 1
+            dst_val = board[dst_idx]
+            if dst_val == -p_sign: # Hit a blot
+                if p_sign > 0: self.black_bar += 1
+                else: self.white_bar += 1
+                board[dst_idx] = p_sign
+            else:
+                board[dst_idx] = dst_val + p_sign
+
+        if src_idx != -1: self._sync_point(src_idx, src_val)
+        if dst_idx != -1: self._sync_point(dst_idx, dst_val)
+        self._sync_counters(bar_w, bar_b, off_w, off_b)
+        self._key = None
+        self._phase_stale = True
+        return (src_idx, dst_idx, src_val, dst_val, bar_w, bar_b, off_w, off_b, derived)
+
+    def unmake_move_base_logic(self, undo):
+        """Reverts a move applied by make_move_base_logic (undo record).
+
+        The record carries the pre-move hash, bitboards, pips and state key,
+        so they are restored as saved rather than re-synced.
+        """
+        (src_idx, dst_idx, original_board_val_src, original_board_val_dst,
+         original_bar_w, original_bar_b, original_off_w, original_off_b, derived) = undo
+        board = self.board
+        if src_idx != -1: board[src_idx] = original_board_val_src
+        if dst_idx != -1: board[dst_idx] = original_board_val_dst
+        self.white_bar, self.black_bar = original_bar_w, original_bar_b
+        self.white_off, self.black_off = original_off_w, original_off_b
+        (self.zhash, self.w_occ, self.b_occ, self.w_blot, self.b_blot,
+         self._pip_w, self._pip_b, self._key) = derived
+        self._phase_stale = True
+
     def determine_game_phase(self):
         """Determines game phase based on pieces off or pip count."""
+        if not self._phase_stale: return self.current_phase
         w_home = self._check_all_pieces_home('w', self)
         b_home = self._check_all_pieces_home('b', self)
 
@@ -515,60 +1001,36 @@ class BackgammonGame:
             else:
                 phase = 'MIDGAME'
         self.current_phase = phase
+        self._phase_stale = False
         return phase
 
     def roll_dice(self):
         """Rolls dice and updates internal state."""
-        d1 = random.randint(1, 6)
-        d2 = random.randint(1, 6)
-        if d1 == d2: self.dice = [d1] * 4
-        else: self.dice = [d1, d2]
-        self.available_moves = self.get_legal_actions()
+        d1 = next(_DICE)
+        d2 = next(_DICE)
+        if d1 == d2: self._dice_mask = d1 * 0x1111
+        else: self._dice_mask = d1 | d2 << 4
+        self.available_moves = None # Recomputed on next read
         return self.dice
 
     def switch_player(self):
         """Switches the current player and resets turn state."""
         self.current_player = 'b' if self.current_player == 'w' else 'w'
-        self.dice = []
+        self._dice_mask = 0
         self.available_moves = []
+        self._playable_cache = {}
 
     def draw_board(self):
         """ Creates a text representation of the board (Your version). """
-        board_template = [
-            list("   13 14 15 16 17 18 |BAR| 19 20 21 22 23 24    "),
-            list("   +-----------------+---+-------------------+  "),
-            list("   |                 |   |                   |  "), # Row 2
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "), # Row 6
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "), # Row 9
-            list("   +-----------------+BAR+-------------------+  "), # Row 10
-            list("   |                 |   |                   |  "), # Row 11
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "),
-            list("   |                 |   |                   |  "), # Row 18 (Added Row)
-            list("   +-----------------+---+-------------------+  "), # Row 19 (was 18)
-            list("   12 11 10 09 08 07 |BAR| 06 05 04 03 02 01    ")  # Row 20 (was 19)
-        ]
-        num_board_rows = len(board_template)
-        base_width = max(len(line) for line in board_template)
-        col_map = {
-             1: 43,  2: 40,  3: 37,  4: 34,  5: 31,  6: 28,
-            19: 28, 20: 31, 21: 34, 22: 37, 23: 40, 24: 43,
-             7: 19,  8: 16,  9: 13, 10: 10, 11:  7, 12:  4,
-            13:  4, 14:  7, 15: 10, 16: 13, 17: 16, 18: 19
-        }
-        bar_col = 23
+        board_template = _TEMPLATE_ROWS
+        num_board_rows = _NUM_BOARD_ROWS
+        base_width = _BOARD_BASE_WIDTH
+        col_map = _COL_MAP
+        bar_col = _BAR_COL
         off_marker_col = 1
         max_checkers_display = 5
-        board_chars = [list(line) for line in board_template]
+        # Rows are pre-split tuples of chars; only the per-row list copy remains
+        board_chars = [list(row) for row in board_template]
 
         # --- Pions sur le plateau ---
         for pos in range(1, 25):
@@ -660,14 +1122,7 @@ class BackgammonGame:
                  board_chars[row][target_col] = disp_val
 
         # --- Infos sur le côté droit ---
-        dice_faces_large = {
-            1: ["+-------+", "|       |", "|   o   |", "|       |", "+-------+"],
-            2: ["+-------+", "| o     |", "|       |", "|     o |", "+-------+"],
-            3: ["+-------+", "| o     |", "|   o   |", "|     o |", "+-------+"],
-            4: ["+-------+", "| o   o |", "|       |", "| o   o |", "+-------+"],
-            5: ["+-------+", "| o   o |", "|   o   |", "| o   o |", "+-------+"],
-            6: ["+-------+", "| o o o |", "|       |", "| o o o |", "+-------+"]
-        }
+        dice_faces_large = _DICE_FACES_LARGE
         dice_height = 5; dice_width = 9; side_info_col = base_width + 1
 
         def write_text(text, row_idx, col, max_width=None):
@@ -704,7 +1159,8 @@ class BackgammonGame:
         write_text(f"B Off [X]: {self.black_off: >2}", 17, side_info_col, max_width=15) # Was 16
 
         die1_base_row, die2_base_row = 5, 11
-        dice_to_draw = list(self.dice)
+        dice_left = self.dice_list()
+        dice_to_draw = list(dice_left)
         dice_drawn_count = 0
         dice_values_to_draw = [None, None]
         if dice_to_draw:
@@ -725,8 +1181,8 @@ class BackgammonGame:
         # Adjust row for remaining dice display
         more_dice_row = 18 # Was 17
         write_text(" " * 20, more_dice_row, side_info_col, max_width=20)
-        if len(self.dice) > dice_drawn_count:
-            remaining_dice_str = ', '.join(map(str, self.dice[dice_drawn_count:]))
+        if len(dice_left) > dice_drawn_count:
+            remaining_dice_str = ', '.join(map(str, dice_left[dice_drawn_count:]))
             extra_dice_str = f"({remaining_dice_str} left)"
             write_text(extra_dice_str, more_dice_row, side_info_col, max_width=20)
 
@@ -739,89 +1195,30 @@ class BackgammonGame:
 
 
     def evaluate_position_heuristic(self, game_state, player_to_evaluate, weights: HeuristicWeights):
-        opp='b' if player_to_evaluate=='w' else 'w';p_sign=1 if player_to_evaluate=='w' else -1;o_sign=-p_sign;board=game_state.board
-        p_pip=game_state.calculate_pip(player_to_evaluate);o_pip=game_state.calculate_pip(opp);pip_score=(o_pip-p_pip)*weights.PIP_SCORE_FACTOR
-        p_off=game_state.white_off if player_to_evaluate=='w' else game_state.black_off;o_off=game_state.black_off if player_to_evaluate=='w' else game_state.white_off;off_score=(p_off-o_off)*weights.OFF_SCORE_FACTOR
-        p_bar=game_state.white_bar if player_to_evaluate=='w' else game_state.black_bar;o_bar=game_state.black_bar if player_to_evaluate=='w' else game_state.white_bar;bar_penalty=p_bar*weights.BAR_PENALTY;hit_bonus=o_bar*weights.HIT_BONUS
-        point_bonus_total=0.0;home_point_bonus_total=0.0;inner_home_bonus_total=0.0;anchor_bonus_total=0.0;blot_penalty_total=0.0;trapped_checker_bonus_total=0.0;made_points_mask=[0]*24;player_blot_positions=[]
-        for i in range(24):
-            pos=i+1;count=board[i];player_checker_count=count*p_sign
-            if player_checker_count>=2:
-                made_points_mask[i]=1;point_bonus_total+=weights.POINT_BONUS
-                is_home=(player_to_evaluate=='w' and 19<=pos<=24) or (player_to_evaluate=='b' and 1<=pos<=6)
-                if is_home:home_point_bonus_total+=weights.HOME_BOARD_POINT_BONUS
-                is_inner_home=(player_to_evaluate=='w' and 22<=pos<=24) or (player_to_evaluate=='b' and 1<=pos<=3)
-                if is_inner_home:inner_home_bonus_total+=weights.INNER_HOME_POINT_BONUS
-                is_anchor=(player_to_evaluate=='w' and 1<=pos<=6) or (player_to_evaluate=='b' and 19<=pos<=24)
-                if is_anchor:anchor_bonus_total+=weights.ANCHOR_BONUS
-            elif player_checker_count==1:player_blot_positions.append(i)
-        if player_blot_positions:
-            opponent_checker_indices=set()
-            for idx,count in enumerate(board):
-                if count*o_sign>0: opponent_checker_indices.add(idx)
-            for blot_idx in player_blot_positions:
-                direct_shots=0
-                for shot_dist in range(1,7):
-                    shooter_idx=blot_idx-shot_dist*o_sign
-                    if 0<=shooter_idx<24 and shooter_idx in opponent_checker_indices:
-                        direct_shots+=abs(board[shooter_idx])
-                if o_bar>0:
-                    entry_die_needed=(blot_idx+1) if player_to_evaluate=='b' else (24-blot_idx)
-                    if 1<=entry_die_needed<=6:
-                        opp_entry_point_idx=(entry_die_needed-1) if player_to_evaluate=='b' else (24-entry_die_needed)
-                        if board[opp_entry_point_idx]*p_sign<2: direct_shots+=o_bar
-                penalty_for_this_blot=direct_shots*weights.DIRECT_SHOT_PENALTY_FACTOR;blot_penalty_total+=penalty_for_this_blot
-            if o_bar>0: blot_penalty_total*=weights.BLOT_PENALTY_REDUCTION_IF_OPP_ON_BAR
-        prime_bonus_total=0.0;max_prime_len=0;current_prime_len=0;prime_segments=[]
-        for i in range(24):
-            if made_points_mask[i]==1: current_prime_len+=1
-            else:
-                if current_prime_len>=4:
-                    prime_end_idx=i-1;prime_start_idx=prime_end_idx-current_prime_len+1
-                    prime_segments.append({'start':prime_start_idx,'end':prime_end_idx,'len':current_prime_len})
-                    prime_bonus_total+=(current_prime_len-3)*weights.PRIME_BASE_BONUS
-                max_prime_len=max(max_prime_len,current_prime_len);current_prime_len=0
-        if current_prime_len>=4:
-            prime_end_idx=23;prime_start_idx=prime_end_idx-current_prime_len+1
-            prime_segments.append({'start':prime_start_idx,'end':prime_end_idx,'len':current_prime_len})
-            prime_bonus_total+=(current_prime_len-3)*weights.PRIME_BASE_BONUS
-        max_prime_len=max(max_prime_len,current_prime_len)
-        if weights.TRAPPED_CHECKER_BONUS!=0:
-            for prime in prime_segments:
-                if prime['len']>=5:
-                    trapped_count=0
-                    trap_zone_indices=range(prime['start']) if player_to_evaluate=='w' else range(prime['end']+1,24)
-                    for trap_idx in trap_zone_indices:
-                        if board[trap_idx]*o_sign>0: trapped_count+=abs(board[trap_idx])
-                    trapped_checker_bonus_total+=trapped_count*weights.TRAPPED_CHECKER_BONUS
-        midgame_prison_bonus=0.0;home_points_made_count=0
-        home_range=range(18,24) if player_to_evaluate=='w' else range(6)
-        for i in home_range:
-            if made_points_mask[i]==1: home_points_made_count+=1
-        if hasattr(weights,'MIDGAME_HOME_PRISON_BONUS') and weights.MIDGAME_HOME_PRISON_BONUS!=0 and home_points_made_count>=3 and o_bar>0:
-             midgame_prison_bonus=weights.MIDGAME_HOME_PRISON_BONUS*o_bar
-        back_checker_penalty=0.0;is_far_behind=p_pip>0 and o_pip>0 and p_pip>=1.5*o_pip
-        if hasattr(weights,'FAR_BEHIND_BACK_CHECKER_PENALTY_FACTOR') and weights.FAR_BEHIND_BACK_CHECKER_PENALTY_FACTOR!=0 and is_far_behind:
-            back_checker_pip_sum=0
-            back_zone=range(1,7) if player_to_evaluate=='w' else range(19,25)
-            for pos in back_zone:
-                point_index=pos-1; count=game_state.board[point_index]
-                if count*p_sign>0:
-                    distance=(25-pos) if player_to_evaluate=='w' else pos
-                    back_checker_pip_sum+=distance*abs(count)
-            back_checker_penalty=back_checker_pip_sum*weights.FAR_BEHIND_BACK_CHECKER_PENALTY_FACTOR*-1.0
-        total_score=(pip_score+off_score+bar_penalty+hit_bonus+point_bonus_total+home_point_bonus_total+inner_home_bonus_total+anchor_bonus_total+prime_bonus_total+blot_penalty_total+midgame_prison_bonus+trapped_checker_bonus_total+back_checker_penalty)
-        return total_score
+        if player_to_evaluate=='w':
+            return _eval_core(game_state.board,game_state.w_occ&~game_state.w_blot,game_state.w_blot,game_state._pip_w,game_state._pip_b,
+                              game_state.white_off,game_state.black_off,game_state.white_bar,game_state.black_bar,_EVAL_SIDE_W,weights)
+        return _eval_core(game_state.board,game_state.b_occ&~game_state.b_blot,game_state.b_blot,game_state._pip_b,game_state._pip_w,
+                          game_state.black_off,game_state.white_off,game_state.black_bar,game_state.white_bar,_EVAL_SIDE_B,weights)
 
 # --- AI Functions ---
-def _get_random_dice_sample():
-    """Generates NUM_DICE_SAMPLES random dice pairs."""
-    samples = []
-    for _ in range(NUM_DICE_SAMPLES):
-        d1 = random.randint(1, 6)
-        d2 = random.randint(1, 6)
-        samples.append((d1, d2))
-    return samples
+# Transposition table: position hash -> (depth, exact score), kept in LRU
+# order and capped at TT_MAX_ENTRIES
+TRANSPOSITION_TABLE = OrderedDict()
+TT_MAX_ENTRIES = 1 << 20
+# Leaf evaluations: (position hash, evaluated player) -> heuristic score.
+# The heuristic only depends on the position, so entries never go stale.
+EVAL_CACHE = {}
+EVAL_CACHE_LIMIT = 500000
+
+class _SearchTimeout(Exception):
+    """Raised inside the search once the move's deadline has passed."""
+
+# Chance nodes enumerate the 21 distinct rolls as (dice_for_turn, probability)
+ALL_ROLLS = tuple(
+    ((d1,) * 4, 1 / 36) if d1 == d2 else ((d1, d2), 2 / 36)
+    for d1 in range(1, 7) for d2 in range(d1, 7)
+)
 
 def generate_possible_next_states_with_sequences(
         current_game_state: BackgammonGame,
@@ -832,26 +1229,26 @@ def generate_possible_next_states_with_sequences(
     Generates pairs of (final_state, sequence) for all unique reachable states
     after playing the full dice roll, enforcing max dice played rule.
     """
-    possible_final_outcomes = {} # Stores { board_tuple : (state, sequence) }
-    memo = {} # Memoization for recursive calls (state_tuple, dice_rem_tuple)
+    possible_final_outcomes = {} # Stores { zhash : (state, sequence) }
+    memo = {} # Memoization for recursive calls (zhash, dice_counts)
 
     # --- Inner recursive function ---
     def find_sequences_recursive(
             state_now: BackgammonGame,
-            dice_rem_tuple: tuple,
+            dice_counts: tuple,
             sequence_so_far: list
         ):
         """Explores move sequences recursively."""
-        state_key_memo = (state_now.board_tuple(), dice_rem_tuple)
+        state_key_memo = (state_now.zhash, dice_counts)
         if state_key_memo in memo:
             return # Already explored this exact situation
         memo[state_key_memo] = True
 
-        # Key for storing results: just the board state
-        current_board_key = state_now.board_tuple()
+        # Key for storing results: just the position (player is fixed here)
+        current_board_key = state_now.zhash
 
         # --- Base case: No dice left ---
-        if not dice_rem_tuple:
+        if dice_counts == _NO_DICE:
             # Store if this final state hasn't been reached before,
             # or if this path is shorter (shouldn't happen with correct logic but safe).
             # We store a copy of the state and the sequence that led to it.
@@ -860,92 +1257,30 @@ def generate_possible_next_states_with_sequences(
             return
 
         # --- Recursive Step ---
-        # Determine which dice can actually be played from this state_now
-        # Must pass state_now explicitly as we are inside recursion
-        allowed_next_dice = state_now._get_strictly_playable_dice(state_now, list(dice_rem_tuple), player)
+        # Every legal next move from state_now, with the dice left after it
+        next_moves = state_now.enumerate_moves(dice_counts, player)
 
-        # If no dice can be played, this sequence ends here. Store the current state.
-        if not allowed_next_dice:
+        # If no die can be played, this sequence ends here. Store the current state.
+        if not next_moves:
             if current_board_key not in possible_final_outcomes or len(sequence_so_far) < len(possible_final_outcomes[current_board_key][1]):
                  possible_final_outcomes[current_board_key] = (state_now.copy(), list(sequence_so_far))
             return
 
-        # Explore moves for each playable die value
-        found_at_least_one_move_this_level = False
-        for die_val in allowed_next_dice:
-            # Find all single moves possible with this die from state_now
-            possible_single_moves = state_now._get_single_moves_for_die(player, die_val, state_now)
-
-            if possible_single_moves:
-                found_at_least_one_move_this_level = True
-                for move in possible_single_moves:
-                    src, dst = move
-                    # --- Figure out which die was *actually* consumed ---
-                    consumed_die = None
-                    temp_dice_list = list(dice_rem_tuple) # Available dice for this path
-                    nominal_die = state_now._get_die_for_move(src, dst, player)
-
-                    # Case 1: Nominal die matches current die value and is available
-                    if nominal_die is not None and nominal_die == die_val and die_val in temp_dice_list:
-                         consumed_die = die_val
-                    # Case 2: Bear-off overshoot check
-                    elif dst == 'off' and isinstance(src, int):
-                        needed_dist = (25 - src) if player == 'w' else src
-                        # Check if the current die_val *could* perform the bear off
-                        if die_val >= needed_dist and state_now._can_bear_off(player, src, die_val, state_now) and die_val in temp_dice_list:
-                            # Find the *smallest available* die that also works
-                            valid_overshoot_dice = sorted([
-                                d for d in temp_dice_list if d >= needed_dist and
-                                state_now._can_bear_off(player, src, d, state_now)
-                            ])
-                            if valid_overshoot_dice:
-                                smallest_valid = valid_overshoot_dice[0]
-                                # Consume the die only if the current die_val *is* that smallest valid die
-                                if die_val == smallest_valid:
-                                     consumed_die = die_val
-
-                    # If no die could be validly consumed for this move/die_val combo, skip
-                    if consumed_die is None:
-                        continue
-
-                    # --- Simulate the move ---
-                    next_state = state_now.copy() # Create a copy for the next step
-                    # Use base logic (no dice update) for simulation
-                    move_ok = next_state.make_move_base_logic(player, src, dst)
-
-                    if move_ok:
-                        # Prepare remaining dice for the recursive call
-                        next_dice_list = list(dice_rem_tuple)
-                        try:
-                            next_dice_list.remove(consumed_die) # Consume the die
-                        except ValueError:
-                             continue
-                        next_dice_rem_tuple = tuple(sorted(next_dice_list))
-
-                        # Add move to current path and recurse
-                        sequence_so_far.append(move)
-                        find_sequences_recursive(next_state, next_dice_rem_tuple, sequence_so_far)
-                        sequence_so_far.pop() # Backtrack: remove move after exploring subtree
-
-        # If no single move was possible *for any* of the allowed dice
-        if not found_at_least_one_move_this_level:
-             if current_board_key not in possible_final_outcomes or len(sequence_so_far) < len(possible_final_outcomes[current_board_key][1]):
-                 possible_final_outcomes[current_board_key] = (state_now.copy(), list(sequence_so_far))
+        for move, next_dice_counts in next_moves:
+            # --- Simulate the move in place (do / recurse / undo) ---
+            # Outcomes are copied when stored, so state_now can be reused
+            undo = state_now._apply_move_fast(p_sign, move[0], move[1])
+            sequence_so_far.append(move)
+            find_sequences_recursive(state_now, next_dice_counts, sequence_so_far)
+            sequence_so_far.pop() # Backtrack: remove move after exploring subtree
+            state_now.unmake_move_base_logic(undo)
     # --- End of Inner Recursive Function ---
 
     # --- Main part of generate_possible_next_states_with_sequences ---
+    p_sign = 1 if player == 'w' else -1
     if not dice_tuple: return [(current_game_state.copy(), [])]
 
-    if len(dice_tuple) == 4: initial_dice_perms = [tuple(dice_tuple)]
-    elif len(dice_tuple) == 2:
-         d1, d2 = dice_tuple[0], dice_tuple[1]
-         initial_dice_perms = [(d1, d2), (d2, d1)] if d1 != d2 else [(d1, d1)] # Handle case like (3,3) input
-    else: initial_dice_perms = [dice_tuple]
-
-    for initial_dice in initial_dice_perms:
-        search_start_state = current_game_state.copy()
-        search_start_state.dice = list(initial_dice)
-        find_sequences_recursive(search_start_state, tuple(sorted(initial_dice)), [])
+    find_sequences_recursive(current_game_state.copy(), _dice_counts(dice_tuple), [])
 
     if not possible_final_outcomes: return [(current_game_state.copy(), [])]
 
@@ -972,91 +1307,191 @@ def generate_possible_next_states_with_sequences(
 
 def get_minimax_score_sampled(
         game_state: BackgammonGame, current_turn_player: str, depth: int,
-        maximizing_player: str, alpha: float, beta: float):
-    """Minimax function with alpha-beta pruning and dice sampling."""
+        maximizing_player: str, deadline: float = None):
+    """Expectiminimax score; chance nodes enumerate all 21 rolls.
+
+    Every roll is searched in full: a chance node cut off part-way yields a
+    partial average, which bounds neither side, so there is no alpha-beta.
+    Raises _SearchTimeout once deadline (a time.time() value) has passed.
+    """
     if game_state.is_game_over():
         if game_state.winner == maximizing_player: return float('inf')
         elif game_state.winner is not None: return float('-inf')
         else: return 0
-    if depth == 0:
+    # Leaf, or a pure race: without contact the lookahead cannot change
+    # hits, blots or primes, so the static evaluation stands in for it.
+    # (A big pip lead is not scored as a forced win: the race is not over.)
+    if depth == 0 or game_state.is_race():
+        eval_key = (game_state.zhash, maximizing_player)
+        score = EVAL_CACHE.get(eval_key)
+        if score is not None: return score
         phase = game_state.determine_game_phase()
         weights = PHASE_WEIGHTS.get(phase, MIDGAME_WEIGHTS)
         score = game_state.evaluate_position_heuristic(game_state, maximizing_player, weights)
+        if len(EVAL_CACHE) >= EVAL_CACHE_LIMIT: EVAL_CACHE.clear()
+        EVAL_CACHE[eval_key] = score
         return score
 
+    tt_key = game_state.zhash ^ (ZOBRIST_SIDE if current_turn_player == 'b' else 0)
+    tt_entry = TRANSPOSITION_TABLE.get(tt_key)
+    if tt_entry is not None and tt_entry[0] >= depth:
+        TRANSPOSITION_TABLE.move_to_end(tt_key)
+        return tt_entry[1]
+    if deadline is not None and time.time() > deadline: raise _SearchTimeout
+
     is_maximizing_node = (current_turn_player == maximizing_player)
     opponent_player = 'b' if current_turn_player == 'w' else 'w'
-    sampled_dice_rolls = _get_random_dice_sample()
     accumulated_score = 0.0
-    num_samples_processed = 0
+    # Different rolls often reach the same child (or the same "no move"
+    # pass): search each position once per node.
+    child_scores = {}
 
     if is_maximizing_node:
-        expected_value = 0.0
-        for d1, d2 in sampled_dice_rolls:
-            dice_for_turn = (d1, d2) * 2 if d1 == d2 else (d1, d2)
+        for dice_for_turn, roll_weight in ALL_ROLLS:
             possible_outcomes = generate_possible_next_states_with_sequences(
                 game_state, dice_for_turn, current_turn_player)
             best_eval_for_this_roll = float('-inf')
             no_move_outcome = (not possible_outcomes or (len(possible_outcomes) == 1 and not possible_outcomes[0][1]))
             if no_move_outcome:
-                 best_eval_for_this_roll = get_minimax_score_sampled(
-                     game_state, opponent_player, depth - 1, maximizing_player, alpha, beta)
+                 best_eval_for_this_roll = child_scores.get(game_state.zhash)
+                 if best_eval_for_this_roll is None:
+                     best_eval_for_this_roll = child_scores[game_state.zhash] = get_minimax_score_sampled(
+                         game_state, opponent_player, depth - 1, maximizing_player, deadline)
             else:
                 for next_state, _ in possible_outcomes:
-                    evaluation = get_minimax_score_sampled(
-                        next_state, opponent_player, depth - 1, maximizing_player, alpha, beta)
+                    evaluation = child_scores.get(next_state.zhash)
+                    if evaluation is None:
+                        evaluation = child_scores[next_state.zhash] = get_minimax_score_sampled(
+                            next_state, opponent_player, depth - 1, maximizing_player, deadline)
                     best_eval_for_this_roll = max(best_eval_for_this_roll, evaluation)
-                    alpha = max(alpha, best_eval_for_this_roll)
-                    if beta <= alpha: break
-            accumulated_score += best_eval_for_this_roll; num_samples_processed += 1
-        avg_score = accumulated_score / num_samples_processed if num_samples_processed > 0 else 0.0
-        return avg_score
+            accumulated_score += roll_weight * best_eval_for_this_roll
+        avg_score = accumulated_score # Roll probabilities sum to 1
     else: # Minimizing node
-        expected_value = 0.0
-        for d1, d2 in sampled_dice_rolls:
-            dice_for_turn = (d1, d2) * 2 if d1 == d2 else (d1, d2)
+        for dice_for_turn, roll_weight in ALL_ROLLS:
             possible_outcomes = generate_possible_next_states_with_sequences(
                 game_state, dice_for_turn, current_turn_player)
             worst_eval_for_this_roll = float('inf')
             no_move_outcome = (not possible_outcomes or (len(possible_outcomes) == 1 and not possible_outcomes[0][1]))
             if no_move_outcome:
-                 worst_eval_for_this_roll = get_minimax_score_sampled(
-                     game_state, opponent_player, depth - 1, maximizing_player, alpha, beta)
+                 worst_eval_for_this_roll = child_scores.get(game_state.zhash)
+                 if worst_eval_for_this_roll is None:
+                     worst_eval_for_this_roll = child_scores[game_state.zhash] = get_minimax_score_sampled(
+                         game_state, opponent_player, depth - 1, maximizing_player, deadline)
             else:
                 for next_state, _ in possible_outcomes:
-                    evaluation = get_minimax_score_sampled(
-                        next_state, opponent_player, depth - 1, maximizing_player, alpha, beta)
+                    evaluation = child_scores.get(next_state.zhash)
+                    if evaluation is None:
+                        evaluation = child_scores[next_state.zhash] = get_minimax_score_sampled(
+                            next_state, opponent_player, depth - 1, maximizing_player, deadline)
                     worst_eval_for_this_roll = min(worst_eval_for_this_roll, evaluation)
-                    beta = min(beta, worst_eval_for_this_roll)
-                    if beta <= alpha: break
-            accumulated_score += worst_eval_for_this_roll; num_samples_processed += 1
-        avg_score = accumulated_score / num_samples_processed if num_samples_processed > 0 else 0.0
-        return avg_score
+            accumulated_score += roll_weight * worst_eval_for_this_roll
+        avg_score = accumulated_score # Roll probabilities sum to 1
+
+    TRANSPOSITION_TABLE[tt_key] = (depth, avg_score)
+    TRANSPOSITION_TABLE.move_to_end(tt_key)
+    if len(TRANSPOSITION_TABLE) > TT_MAX_ENTRIES:
+        TRANSPOSITION_TABLE.popitem(last=False) # Evict least recently used
+    return avg_score
+
+
+# --- Root-Parallel Search ---
+# Root children are independent subtrees: each is searched in a worker
+# process, which keeps its own transposition table.
+_SEARCH_POOL = None
+_search_id = 0 # Bumped per root search (parent side)
+_worker_search_id = None # Last search seen by this worker
+_worker_playable_cache = {}
+
+def _get_search_pool():
+    """Returns the shared worker pool, starting it on first use."""
+    global _SEARCH_POOL
+    if _SEARCH_POOL is None:
+        _SEARCH_POOL = ProcessPoolExecutor(max_workers=AI_WORKERS)
+    return _SEARCH_POOL
+
+def _search_child(payload, player, depth, maximizing_player, search_id, deadline):
+    """Worker task: minimax score of one root child, player to move.
+
+    Returns None when the deadline passes first, so a worker never stays
+    busy on a search the parent has already given up on.
+    """
+    global _worker_search_id
+    if search_id != _worker_search_id:
+        TRANSPOSITION_TABLE.clear() # Stored scores are relative to the searching side
+        _worker_search_id = search_id
+    game_state = BackgammonGame.from_payload(payload, _worker_playable_cache)
+    try:
+        return get_minimax_score_sampled(
+            game_state, player, depth, maximizing_player, deadline)
+    except _SearchTimeout:
+        return None
+
+def _score_root_children_parallel(possible_outcomes, opponent_player, ai_player, depth, deadline):
+    """Scores root children to depth, one pool task per child.
+
+    Returns the scores in child order, stopping at the first child still
+    unscored at the deadline (tasks not yet started are cancelled).
+    """
+    global _search_id
+    _search_id += 1
+    pool = _get_search_pool()
+    futures = [
+        pool.submit(_search_child, next_state.to_payload(), opponent_player,
+                    depth, ai_player, _search_id, deadline)
+        for next_state, _ in possible_outcomes
+    ]
+    child_scores = []
+    for future in futures:
+        score = future.result() # Workers stop at the deadline themselves
+        if score is None:
+            for pending in futures: pending.cancel()
+            break
+        child_scores.append(score)
+    return child_scores
 
 
 def select_ai_move_minimax(
         current_game_state: BackgammonGame, dice_tuple: tuple, ai_player: str):
     """Selects best move sequence and resulting state for AI using Minimax."""
+    TRANSPOSITION_TABLE.clear() # Stored scores are relative to ai_player
     possible_outcomes = generate_possible_next_states_with_sequences(
         current_game_state, dice_tuple, ai_player)
 
     if not possible_outcomes or (len(possible_outcomes) == 1 and not possible_outcomes[0][1]):
         return [], current_game_state # No move possible
 
-    best_score = float('-inf')
-    optimal_resulting_state = None
-    optimal_sequence = []
     opponent_player = 'b' if ai_player == 'w' else 'w'
+    deadline = time.time() + AI_TIME_BUDGET
+    use_pool = AI_WORKERS > 1 and len(possible_outcomes) > 1
 
-    for next_state, sequence in possible_outcomes:
-        score_for_state = get_minimax_score_sampled(
-            next_state, opponent_player, MAX_DEPTH - 1, ai_player,
-            float('-inf'), float('inf'))
-
-        if score_for_state > best_score:
-            best_score = score_for_state
-            optimal_resulting_state = next_state
-            optimal_sequence = sequence
+    # Iterative deepening: each depth searches children best-first (order of
+    # the previous depth), so a timed-out depth has scored the likeliest moves.
+    scored = [(0.0, next_state, sequence) for next_state, sequence in possible_outcomes]
+    optimal_resulting_state = None
+    optimal_sequence = []
+    for depth in range(1, MAX_DEPTH + 1):
+        if use_pool and depth > 1:
+            child_scores = _score_root_children_parallel(
+                [(next_state, sequence) for _, next_state, sequence in scored],
+                opponent_player, ai_player, depth - 1, deadline)
+            iteration = [(score, next_state, sequence) for score, (_, next_state, sequence)
+                         in zip(child_scores, scored)] # Partial depth: keep what was searched
+        else:
+            iteration = []
+            for _, next_state, sequence in scored:
+                try:
+                    score_for_state = get_minimax_score_sampled(
+                        next_state, opponent_player, depth - 1, ai_player, deadline)
+                except _SearchTimeout:
+                    break # Partial depth: keep the children searched in full
+                iteration.append((score_for_state, next_state, sequence))
+
+        if not iteration: break # Out of time before any child: keep the previous depth
+        _, optimal_resulting_state, optimal_sequence = max(
+            iteration, key=lambda entry: entry[0])
+        if len(iteration) < len(scored) or time.time() > deadline: break
+        iteration.sort(key=lambda entry: entry[0], reverse=True)
+        scored = iteration
 
     if optimal_resulting_state is None:
         if possible_outcomes:
@@ -1089,10 +1524,11 @@ def main_play_vs_ai():
     ai_player = 'b' if human_player == 'w' else 'w'
     print(f"\nOkay, you are Player {human_player.upper()} "
           f"({'O' if human_player == 'w' else 'X'}). AI is {ai_player.upper()}.")
-    print(f"AI Search Depth: {MAX_DEPTH}, Dice Samples: {NUM_DICE_SAMPLES}")
+    print(f"AI Search Depth: {MAX_DEPTH}, Chance Rolls: all {len(ALL_ROLLS)}")
     print("Enter moves as 'src/dst' (e.g., 13/7, bar/5, 24/off).")
     input("Press Enter to start...")
 
+    EVAL_CACHE.clear() # Fresh leaf cache per game
     game = BackgammonGame(human_player=human_player)
     game.current_player = 'w'
     turn_count = 0
@@ -1138,7 +1574,7 @@ def main_play_vs_ai():
 
                 while game.dice and game.available_moves:
                     print("\n" + '-' * 40)
-                    print(f"   Dice left: {game.dice}")
+                    print(f"   Dice left: {game.dice_list()}")
                     sorted_available = sorted(
                         game.available_moves,
                         key=lambda m: (str(m[0]), str(m[1]))